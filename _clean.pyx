@@ -0,0 +1,71 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+"""
+Compiled version of spotify_to_jellyfin.clean_text.
+Build with: cythonize -i _clean.pyx
+Must produce exactly the same keys as the pure-Python version.
+"""
+
+import urllib.parse
+
+# ASCII characters kept in a search key (a-z, 0-9)
+cdef bint _KEEP[128]
+for _c in range(128):
+    _KEEP[_c] = (0x61 <= _c <= 0x7a) or (0x30 <= _c <= 0x39)
+
+
+cdef str _strip_enclosed(str text, Py_UCS4 open_ch, Py_UCS4 close_ch):
+    """Removes open...close regions (not spanning newlines), like re.sub(r'\\[.*?\\]')."""
+    cdef Py_ssize_t n = len(text)
+    cdef Py_ssize_t i = 0, j, keep = 0
+    cdef Py_UCS4 ch
+    cdef list parts = []
+
+    while i < n:
+        if text[i] == open_ch:
+            j = i + 1
+            while j < n:
+                ch = text[j]
+                if ch == close_ch or ch == u'\n':
+                    break
+                j += 1
+            if j < n and text[j] == close_ch:
+                parts.append(text[keep:i])
+                keep = j + 1
+                i = j + 1
+                continue
+        i += 1
+
+    if keep == 0:
+        return text
+    parts.append(text[keep:])
+    return ''.join(parts)
+
+
+cpdef str clean_text(str text, object junk_re):
+    """Builds a search key; junk_re is the caller's compiled junk-word pattern."""
+    cdef Py_UCS4 ch
+    cdef bytearray out
+
+    if not text:
+        return ""
+    text = urllib.parse.unquote(text).lower()
+
+    # Remove youtube brackets [id], then parentheses content
+    text = _strip_enclosed(text, u'[', u']')
+    text = _strip_enclosed(text, u'(', u')')
+
+    # Remove junk words
+    text = junk_re.sub('', text)
+
+    # Keep letters and numbers only
+    out = bytearray()
+    for ch in text:
+        if ch < 128 and _KEEP[ch]:
+            out.append(ch)
+    text = out.decode('ascii')
+
+    # Remove leading "the" (The Kooks -> kooks)
+    if text.startswith("the"):
+        text = text[3:]
+
+    return text
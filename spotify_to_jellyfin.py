@@ -11,10 +11,24 @@ import re
 import urllib.parse
 import sys
 import time
-import difflib
+import threading
+from array import array
+from collections import Counter, deque
+from concurrent.futures import FIRST_EXCEPTION, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from functools import lru_cache
+import marisa_trie
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
 from pathlib import Path
 from dotenv import load_dotenv
+from rapidfuzz import process, fuzz
+
+# Optional Cython build of clean_text (cythonize -i _clean.pyx)
+try:
+    from _clean import clean_text as _compiled_clean_text
+except ImportError:
+    _compiled_clean_text = None
 
 # Load environment variables from .env file
 load_dotenv()
@@ -24,12 +38,39 @@ JELLYFIN_URL = os.getenv("JELLYFIN_URL", "")
 API_KEY = os.getenv("JELLYFIN_API_KEY", "")
 USER_ID = os.getenv("JELLYFIN_USER_ID", "")
 FUZZY_THRESHOLD = 0.85  # 85% similarity required for fuzzy matching
+LIBRARY_PAGE_SIZE = 2000  # Items fetched (and indexed) per request
+PLAYLIST_BATCH_SIZE = 200  # Item IDs added to a playlist per request
+CSV_WORKERS = 8  # CSV files imported concurrently in folder mode
 # =================================================
 
 session = requests.Session()
 session.headers.update({"X-Emby-Token": API_KEY, "Content-Type": "application/json"})
-
-
+# Keep connections to the Jellyfin host alive and pooled across requests
+session.mount("http://", HTTPAdapter(pool_connections=10, pool_maxsize=20))
+session.mount("https://", HTTPAdapter(pool_connections=10, pool_maxsize=20))
+
+# Spotify export column names, in order of preference
+ARTIST_COLUMNS = ('Artist Name(s)', 'Artist', 'artist')
+TRACK_COLUMNS = ('Track Name', 'Track', 'track', 'name')
+
+# Serializes console output from concurrent CSV imports
+_print_lock = threading.Lock()
+
+# Patterns used by clean_text, compiled once
+_BRACKET_RE = re.compile(r'\[.*?\]')
+_PAREN_RE = re.compile(r'\(.*?\)')
+# Junk words, longest first so "remastered" wins over "remaster"
+_JUNK_RE = re.compile(
+    r'remastered|remaster|visualizer|visualiser|soundtrack|official'
+    r'|lyrics|audio|video|topic|hd|4k|mv'
+)
+# Deletes every ASCII character except a-z and 0-9
+_NONALNUM_TABLE = str.maketrans('', '', ''.join(
+    chr(c) for c in range(128) if not ('a' <= chr(c) <= 'z' or '0' <= chr(c) <= '9')
+))
+
+
+@lru_cache(maxsize=65536)
 def clean_text(text):
     """
     Creates a 'search key'.
@@ -38,24 +79,27 @@ def clean_text(text):
     3. Removes junk words
     4. Removes leading 'the'
     5. Returns only alphanumeric characters
+
+    Results are cached, since artist names repeat across many tracks.
+    Uses the compiled _clean module when it has been built.
     """
     if not text:
         return ""
+    if _compiled_clean_text is not None:
+        return _compiled_clean_text(text, _JUNK_RE)
+
     text = urllib.parse.unquote(text).lower()
 
     # Remove youtube brackets [id]
-    text = re.sub(r'\[.*?\]', '', text)
+    text = _BRACKET_RE.sub('', text)
     # Remove parentheses content (remix info, etc)
-    text = re.sub(r'\(.*?\)', '', text)
+    text = _PAREN_RE.sub('', text)
 
     # Remove junk words
-    junk = ["official", "video", "audio", "lyrics", "visualiser", "visualizer", 
-            "hd", "4k", "mv", "soundtrack", "topic", "remaster", "remastered"]
-    for word in junk:
-        text = text.replace(word, "")
+    text = _JUNK_RE.sub('', text)
 
     # Remove non-alphanumeric (keep letters and numbers only)
-    text = re.sub(r'[^a-z0-9]', '', text)
+    text = text.encode('ascii', 'ignore').decode('ascii').translate(_NONALNUM_TABLE)
 
     # Remove leading "the" (The Kooks -> kooks)
     if text.startswith("the"):
@@ -64,6 +108,43 @@ def clean_text(text):
     return text
 
 
+def _index_chunk(items_chunk):
+    """
+    Builds the search keys for a slice of library items.
+    Returns a dict of {key: item_id}; the first item to claim a key keeps it.
+    """
+    chunk_map = {}
+
+    for item in items_chunk:
+        item_id = item["Id"]
+        name = item.get("Name", "")
+        artists = item.get("Artists", [])
+
+        # 1. Title Only Key
+        t_key = clean_text(name)
+        if not t_key:
+            continue
+        chunk_map.setdefault(t_key, item_id)
+
+        # 2. Artist + Title Key (most reliable), once per distinct artist
+        for a_key in dict.fromkeys(clean_text(artist) for artist in artists):
+            if a_key:
+                chunk_map.setdefault(a_key + t_key, item_id)
+
+    return chunk_map
+
+
+def _fetch_items_page(params, start_index):
+    """Fetches one page of library items from Jellyfin."""
+    r = session.get(
+        f"{JELLYFIN_URL}/Items",
+        params={**params, "StartIndex": start_index, "Limit": LIBRARY_PAGE_SIZE},
+        headers={"Accept-Encoding": "gzip"}
+    )
+    r.raise_for_status()
+    return orjson.loads(r.content).get("Items", [])
+
+
 def fetch_library_index():
     """Fetches all audio items from Jellyfin and builds a search index."""
     print(f"⏳ Downloading Jellyfin library index from: {JELLYFIN_URL}")
@@ -72,89 +153,200 @@ def fetch_library_index():
     params = {
         "IncludeItemTypes": "Audio",
         "Recursive": "true",
-        "Fields": "Name,Artists,Album",
-        "UserId": USER_ID
+        "Fields": "Name,Artists",
+        "UserId": USER_ID,
+        # Skip the heavy per-item objects we never read
+        "EnableUserData": "false",
+        "EnableImages": "false",
+        "EnableImageTypes": "",
+        # A fixed order keeps pages from skipping or repeating items
+        "SortBy": "SortName,DateCreated",
+        "SortOrder": "Ascending"
     }
 
+    # Store keys pointing to IDs (merged in item order, first item wins)
+    index_map = {}
+    indexed = 0
+
+    def merge(chunk_map):
+        for key, item_id in chunk_map.items():
+            index_map.setdefault(key, item_id)
+
     try:
-        r = session.get(f"{JELLYFIN_URL}/Items", params=params)
+        # Probe the library size, then page through it
+        r = session.get(f"{JELLYFIN_URL}/Items", params={**params, "Limit": 1})
         r.raise_for_status()
-        items = r.json().get("Items", [])
+        total = orjson.loads(r.content).get("TotalRecordCount", 0)
+        print(f"   Library has {total} items. Building Index...")
+
+        pages = (_fetch_items_page(params, i) for i in range(0, total, LIBRARY_PAGE_SIZE))
+
+        if total > LIBRARY_PAGE_SIZE:
+            # Index each page in a worker process while the next one downloads,
+            # keeping at most one page per worker in flight
+            workers = os.cpu_count() or 1
+            in_flight = deque()
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                for page in pages:
+                    indexed += len(page)
+                    in_flight.append(executor.submit(_index_chunk, page))
+                    if len(in_flight) >= workers:
+                        merge(in_flight.popleft().result())
+                while in_flight:
+                    merge(in_flight.popleft().result())
+        else:
+            for page in pages:
+                indexed += len(page)
+                merge(_index_chunk(page))
     except Exception as e:
         print(f"❌ API Error: {e}")
         sys.exit(1)
 
-    print(f"   Fetched {len(items)} items in {round(time.time() - start, 2)}s. Building Index...")
-
-    # Store keys pointing to IDs
-    index_map = {}
-
-    for item in items:
-        item_id = item["Id"]
-        name = item.get("Name", "")
-        artists = item.get("Artists", [])
-
-        # 1. Title Only Key
-        t_key = clean_text(name)
-        if t_key:
-            index_map[t_key] = item_id
-
-        # 2. Artist + Title Key (most reliable)
-        for artist in artists:
-            a_key = clean_text(artist)
-            if a_key and t_key:
-                full_key = a_key + t_key
-                index_map[full_key] = item_id
-
-    print(f"✅ Index ready ({len(index_map)} keys).")
-    return index_map
+    print(f"   Indexed {indexed} items in {round(time.time() - start, 2)}s.")
+
+    # Pack the keys into a compact trie; item IDs and trigram postings
+    # refer to keys by their trie ID instead of holding the strings
+    key_trie = marisa_trie.Trie(index_map)
+    item_ids = [None] * len(key_trie)
+
+    # Map each key's trigrams back to it, so fuzzy matching only
+    # has to score keys that look alike
+    trigram_index = {}
+    # Keys short enough to match a search key too short for trigram blocking
+    short_keys = {}
+    for key, item_id in index_map.items():
+        key_id = key_trie[key]
+        item_ids[key_id] = item_id
+        for gram in _trigrams(key):
+            trigram_index.setdefault(gram, array('I')).append(key_id)
+        if len(key) <= _SHORT_KEY_MAX:
+            short_keys[key_id] = key
+
+    print(f"✅ Index ready ({len(key_trie)} keys).")
+    return {
+        "keys": key_trie,
+        "item_ids": item_ids,
+        "trigrams": trigram_index,
+        "short_keys": short_keys
+    }
 
 
-def find_fuzzy_match(search_key, index_keys):
-    """Returns the best match if score > threshold."""
-    matches = difflib.get_close_matches(search_key, index_keys, n=1, cutoff=FUZZY_THRESHOLD)
-    if matches:
-        return matches[0]
-    return None
+def _trigrams(key):
+    """Returns the set of 3-character substrings of a key."""
+    return {key[i:i + 3] for i in range(len(key) - 2)}
 
 
-def find_track_in_index(artist, track_name, index_map):
+@lru_cache(maxsize=None)
+def _max_broken_trigrams(length):
     """
-    Attempts to find a matching track in Jellyfin library.
-    Returns (item_id, match_type) or (None, reason).
+    Returns how many of a key's trigrams an edit within FUZZY_THRESHOLD can break.
+    A query char outside the common subsequence breaks up to 3 trigrams and an
+    extra candidate char up to 2; the ratio caps how many of each there can be.
     """
-    candidates = []
+    budget = 1 - FUZZY_THRESHOLD
+    worst = 0
+    for dropped in range(length + 1):
+        extra = 0
+        # ratio = 1 - (dropped + extra) / (query length + candidate length)
+        while dropped + extra + 1 <= budget * (2 * length - dropped + extra + 1) + 1e-9:
+            extra += 1
+        if dropped + extra <= budget * (2 * length - dropped + extra) + 1e-9:
+            worst = max(worst, 3 * dropped + 2 * extra)
+    return worst
+
+
+# Longest search key whose trigrams can't rule out any candidate, and the
+# longest index key that could still be within the threshold of it
+_SHORT_QUERY_MAX = max(
+    length for length in range(1, 64)
+    if length - 2 <= _max_broken_trigrams(length)
+)
+_SHORT_KEY_MAX = int(_SHORT_QUERY_MAX * (2 - FUZZY_THRESHOLD) / FUZZY_THRESHOLD)
+
+
+def find_fuzzy_matches(search_keys, index):
+    """
+    Fuzzy matches a batch of search keys against the index.
+    Returns the best matching item ID (or None) for each search key.
+    """
+    key_trie = index["keys"]
+    trigram_index = index["trigrams"]
+    matches = []
+
+    for search_key in search_keys:
+        # Any key within the threshold shares at least this many trigrams
+        # with the search key (q-gram lemma), so only those need scoring
+        grams = _trigrams(search_key)
+        needed = len(grams) - _max_broken_trigrams(len(search_key))
+
+        if needed > 0:
+            shared = Counter()
+            for gram in grams:
+                shared.update(trigram_index.get(gram, ()))
+            choices = {
+                key_id: key_trie.restore_key(key_id)
+                for key_id, count in shared.items() if count >= needed
+            }
+        elif len(search_key) <= _SHORT_QUERY_MAX:
+            # Too short for the bound to rule anything out, but only
+            # similarly short keys can be within the threshold
+            choices = index["short_keys"]
+        else:
+            # Highly repetitive key with few distinct trigrams
+            choices = {key_trie[key]: key for key in key_trie.iterkeys()}
+
+        # Keys are already normalized by clean_text, so skip rapidfuzz's processor
+        hit = process.extractOne(
+            search_key, choices,
+            scorer=fuzz.ratio,
+            score_cutoff=FUZZY_THRESHOLD * 100,
+            processor=None
+        ) if choices else None
+        matches.append(index["item_ids"][hit[2]] if hit else None)
+
+    return matches
+
+
+def track_search_keys(artist, track_name):
+    """
+    Builds the search keys for a track, most reliable first.
+    Returns a dict of {match_type: key}.
+    """
+    # Clean each field exactly once
+    artist_key = clean_text(artist) if artist else ''
+    title_key = clean_text(track_name) if track_name else ''
+    candidates = {}
 
-    # Candidate 1: Artist + Title (most reliable)
-    if artist and track_name:
-        artist_key = clean_text(artist)
-        title_key = clean_text(track_name)
-        combined_key = artist_key + title_key
-        candidates.append(("combined", combined_key))
+    # Candidate 1: Artist + Title (most reliable; skipped if the artist
+    # cleaned away to nothing, since it would just repeat the title key)
+    if artist_key and track_name:
+        candidates["combined"] = artist_key + title_key
 
     # Candidate 2: Title only
     if track_name:
-        title_key = clean_text(track_name)
-        candidates.append(("title", title_key))
+        candidates["title"] = title_key
 
-    for match_type, key in candidates:
-        if not key:
-            continue
+    return {match_type: key for match_type, key in candidates.items() if key}
 
-        # Step 1: Exact Match
-        if key in index_map:
-            return index_map[key], f"Exact ({match_type})"
 
-        # Step 2: Fuzzy Match (catches typos, slight variations)
-        if len(key) > 4:
-            fuzzy_key = find_fuzzy_match(key, index_map.keys())
-            if fuzzy_key:
-                return index_map[fuzzy_key], f"Fuzzy ({match_type})"
+def find_track_in_index(search_keys, index):
+    """
+    Attempts to find an exact match for a track in Jellyfin library.
+    Returns (item_id, match_type) or (None, reason).
+
+    Fuzzy matching is left to the caller, so that an exact title-only hit
+    always beats a fuzzy artist + title guess.
+    """
+    # One trie probe per key, returning on the first hit
+    for match_type, key in search_keys.items():
+        key_id = index["keys"].get(key)
+        if key_id is not None:
+            return index["item_ids"][key_id], f"Exact ({match_type})"
 
     return None, "Not found"
 
 
-def get_or_create_playlist(name):
+def get_or_create_playlist(name, log=print):
     """Gets existing playlist by name or creates a new one."""
     try:
         r = session.get(
@@ -165,14 +357,14 @@ def get_or_create_playlist(name):
                 "Recursive": "true"
             }
         )
-        data = r.json()
+        data = orjson.loads(r.content)
         if data["TotalRecordCount"] > 0:
             # Check for exact name match
             for item in data["Items"]:
                 if item["Name"].lower() == name.lower():
                     return item["Id"], True
     except Exception as e:
-        print(f"⚠️ Error searching for playlist: {e}")
+        log(f"⚠️ Error searching for playlist: {e}")
 
     # Create new playlist
     try:
@@ -181,9 +373,9 @@ def get_or_create_playlist(name):
             params={"Name": name, "UserId": USER_ID}
         )
         r.raise_for_status()
-        return r.json()["Id"], False
+        return orjson.loads(r.content)["Id"], False
     except Exception as e:
-        print(f"❌ Error creating playlist: {e}")
+        log(f"❌ Error creating playlist: {e}")
         sys.exit(1)
 
 
@@ -194,94 +386,128 @@ def get_playlist_items(playlist_id):
             f"{JELLYFIN_URL}/Playlists/{playlist_id}/Items",
             params={"UserId": USER_ID}
         )
-        return {i["Id"] for i in r.json().get("Items", [])}
+        return {i["Id"] for i in orjson.loads(r.content).get("Items", [])}
     except:
         return set()
 
 
-def add_items_to_playlist(playlist_id, item_ids):
+def add_items_to_playlist(playlist_id, item_ids, log=print):
     """Adds items to a Jellyfin playlist."""
     if not item_ids:
         return
 
     try:
-        session.post(
-            f"{JELLYFIN_URL}/Playlists/{playlist_id}/Items",
-            params={"Ids": ",".join(item_ids), "UserId": USER_ID}
-        )
+        # Post in batches to stay under server URL length limits
+        for i in range(0, len(item_ids), PLAYLIST_BATCH_SIZE):
+            session.post(
+                f"{JELLYFIN_URL}/Playlists/{playlist_id}/Items",
+                params={"Ids": ",".join(item_ids[i:i + PLAYLIST_BATCH_SIZE]), "UserId": USER_ID}
+            )
     except Exception as e:
-        print(f"⚠️ Error adding items to playlist: {e}")
+        log(f"⚠️ Error adding items to playlist: {e}")
 
 
-def process_csv(csv_path, playlist_name, index_map, verbose=False):
-    """Processes a Spotify CSV file and creates/updates a Jellyfin playlist."""
-    print(f"\n📂 Processing: {csv_path}")
-    print(f"   Playlist name: {playlist_name}")
+def process_csv(csv_path, playlist_name, index, verbose=False, log=print):
+    """
+    Processes a Spotify CSV file and creates/updates a Jellyfin playlist.
+    Progress and results are reported through `log` (print by default).
+    """
+    log(f"\n📂 Processing: {csv_path}")
+    log(f"   Playlist name: {playlist_name}")
 
     # Get or create playlist
-    playlist_id, exists = get_or_create_playlist(playlist_name)
+    playlist_id, exists = get_or_create_playlist(playlist_name, log)
     status = "Found existing" if exists else "Created new"
-    print(f"   {status} playlist (ID: {playlist_id})")
+    log(f"   {status} playlist (ID: {playlist_id})")
 
     # Get existing items to avoid duplicates
     existing_ids = get_playlist_items(playlist_id) if exists else set()
 
     to_add = []
+    to_add_set = set()
     missing = []
     found_count = 0
     skipped_count = 0
     fieldnames = []
+    tracks = []
+    results = []
 
     try:
         with open(csv_path, 'r', encoding='utf-8') as f:
             reader = csv.DictReader(f)
             fieldnames = reader.fieldnames or []
 
+            # Handle different CSV column names (resolved once per file)
+            artist_col = next((c for c in ARTIST_COLUMNS if c in fieldnames), None)
+            track_col = next((c for c in TRACK_COLUMNS if c in fieldnames), None)
+
             for row in reader:
-                # Handle different CSV column names
-                artist = row.get('Artist Name(s)') or row.get('Artist') or row.get('artist') or ''
-                track = row.get('Track Name') or row.get('Track') or row.get('track') or row.get('name') or ''
+                artist = (row[artist_col] or '') if artist_col else ''
+                track = (row[track_col] or '') if track_col else ''
 
                 if not track:
                     continue
 
-                found_id, match_type = find_track_in_index(artist, track, index_map)
-
-                if found_id:
-                    if found_id not in existing_ids and found_id not in to_add:
-                        to_add.append(found_id)
-                        found_count += 1
-                        if verbose:
-                            print(f"   ✓ {artist} - {track} [{match_type}]")
-                    else:
-                        skipped_count += 1
-                else:
-                    missing.append(row)
+                # Pass 1: Exact matches straight from the index
+                # (artist + title, then title only)
+                search_keys = track_search_keys(artist, track)
+                tracks.append((row, artist, track, search_keys))
+                results.append(find_track_in_index(search_keys, index))
 
     except FileNotFoundError:
-        print(f"❌ File not found: {csv_path}")
+        log(f"❌ File not found: {csv_path}")
         return
     except Exception as e:
-        print(f"❌ Error reading CSV: {e}")
+        log(f"❌ Error reading CSV: {e}")
         return
 
+    # Pass 2: Fuzzy match only the rows with no exact hit, one batch per
+    # key type (catches typos, slight variations)
+    for match_type in ("combined", "title"):
+        pending = []
+        for i, (_, _, _, search_keys) in enumerate(tracks):
+            key = search_keys.get(match_type)
+            if results[i][0] is None and key and len(key) > 4:
+                pending.append((i, key))
+
+        if not pending:
+            continue
+
+        fuzzy_ids = find_fuzzy_matches([key for _, key in pending], index)
+        for (i, _), item_id in zip(pending, fuzzy_ids):
+            if item_id:
+                results[i] = (item_id, f"Fuzzy ({match_type})")
+
+    for (row, artist, track, _), (found_id, match_type) in zip(tracks, results):
+        if found_id:
+            if found_id not in existing_ids and found_id not in to_add_set:
+                to_add.append(found_id)
+                to_add_set.add(found_id)
+                found_count += 1
+                if verbose:
+                    log(f"   ✓ {artist} - {track} [{match_type}]")
+            else:
+                skipped_count += 1
+        else:
+            missing.append(row)
+
     # Add tracks to playlist
     if to_add:
-        add_items_to_playlist(playlist_id, to_add)
+        add_items_to_playlist(playlist_id, to_add, log)
 
     # Print summary
-    print(f"\n   📊 Results for '{playlist_name}':")
-    print(f"      ✅ Added: {found_count}")
-    print(f"      ⏭️  Skipped (duplicates): {skipped_count}")
-    print(f"      ❌ Missing: {len(missing)}")
+    log(f"\n   📊 Results for '{playlist_name}':")
+    log(f"      ✅ Added: {found_count}")
+    log(f"      ⏭️  Skipped (duplicates): {skipped_count}")
+    log(f"      ❌ Missing: {len(missing)}")
 
     # Print missing tracks
     if missing and verbose:
-        print(f"\n   Missing tracks:")
+        log(f"\n   Missing tracks:")
         for row in missing:
-            artist = row.get('Artist Name(s)') or row.get('Artist') or row.get('artist') or ''
-            track = row.get('Track Name') or row.get('Track') or row.get('track') or row.get('name') or ''
-            print(f"      ❌ {artist} - {track}")
+            artist = (row[artist_col] or '') if artist_col else ''
+            track = (row[track_col] or '') if track_col else ''
+            log(f"      ❌ {artist} - {track}")
 
     return {
         "added": found_count,
@@ -292,7 +518,7 @@ def process_csv(csv_path, playlist_name, index_map, verbose=False):
     }
 
 
-def process_folder(folder_path, index_map, verbose=False):
+def process_folder(folder_path, index, verbose=False):
     """Processes all CSV files in a folder."""
     if not os.path.isdir(folder_path):
         print(f"❌ Folder not found: {folder_path}")
@@ -312,16 +538,53 @@ def process_folder(folder_path, index_map, verbose=False):
     all_missing = []
     all_fieldnames = set()
 
-    for csv_file in csv_files:
-        playlist_name = os.path.splitext(csv_file)[0].replace("_", " ")
-        csv_path = os.path.join(folder_path, csv_file)
-
-        result = process_csv(csv_path, playlist_name, index_map, verbose)
-        if result:
-            total_added += result["added"]
-            total_missing += result["missing"]
-            all_missing.extend([(playlist_name, t) for t in result["missing_tracks"]])
-            all_fieldnames.update(result["fieldnames"])
+    jobs = [
+        (os.path.splitext(csv_file)[0].replace("_", " "), os.path.join(folder_path, csv_file))
+        for csv_file in csv_files
+    ]
+
+    # Files mapping to the same playlist (e.g. My_Mix.csv and My Mix.csv)
+    # are imported one at a time, so they can't both create it
+    playlist_locks = {name.lower(): threading.Lock() for name, _ in jobs}
+    failed = threading.Event()
+
+    def import_csv(csv_path, playlist_name):
+        # Skip files picked up after another import failed (e.g. exited)
+        if failed.is_set():
+            return None
+
+        # Buffer each CSV's report and print it in one piece, so
+        # concurrent imports don't interleave their output
+        lines = []
+        try:
+            with playlist_locks[playlist_name.lower()]:
+                return process_csv(csv_path, playlist_name, index, verbose, log=lines.append)
+        except BaseException:
+            failed.set()
+            raise
+        finally:
+            with _print_lock:
+                print("\n".join(lines))
+
+    with ThreadPoolExecutor(max_workers=CSV_WORKERS) as executor:
+        futures = [
+            (playlist_name, executor.submit(import_csv, csv_path, playlist_name))
+            for playlist_name, csv_path in jobs
+        ]
+
+        # Cancel the files still queued as soon as one import fails
+        wait([future for _, future in futures], return_when=FIRST_EXCEPTION)
+        if failed.is_set():
+            for _, future in futures:
+                future.cancel()
+
+        for playlist_name, future in futures:
+            result = future.result()
+            if result:
+                total_added += result["added"]
+                total_missing += result["missing"]
+                all_missing.extend([(playlist_name, t) for t in result["missing_tracks"]])
+                all_fieldnames.update(result["fieldnames"])
 
     print(f"\n{'='*50}")
     print(f"📊 TOTAL: Added {total_added} tracks, Missing {total_missing} tracks")
@@ -359,16 +622,16 @@ def main():
     verbose = verbose_input in ('y', 'yes')
 
     # Fetch Jellyfin library index
-    index_map = fetch_library_index()
+    index = fetch_library_index()
 
     if mode == "2":
         folder = input("Enter folder path [./exports]: ").strip() or "./exports"
-        process_folder(folder, index_map, verbose)
+        process_folder(folder, index, verbose)
     else:
         csv_path = input("Enter CSV file path: ").strip()
         default_name = os.path.splitext(os.path.basename(csv_path))[0].replace("_", " ") if csv_path else "Imported Playlist"
         playlist_name = input(f"Enter playlist name [{default_name}]: ").strip() or default_name
-        process_csv(csv_path, playlist_name, index_map, verbose)
+        process_csv(csv_path, playlist_name, index, verbose)
 
     print("\n🏁 Done!")
 